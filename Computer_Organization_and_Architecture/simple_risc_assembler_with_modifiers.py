@@ -1,36 +1,43 @@
 import re
+import sys
+from array import array
 
 # --- SimpleRisc ISA Definitions (Simplified for this example) ---
 
-# Opcodes (from SimpleRisc Table 3.10) - 5 bits
-OPCODES = {
-    'add': '00000', 'sub': '00001', 'mul': '00010', 'div': '00011', 'mod': '00100',
-    'cmp': '00101', 'and': '00110', 'or': '00111', 'not': '01000', 'mov': '01001',
-    'addu': '00000', 'subu': '00001', 'mulu': '00010', 'divu': '00011', 'modu': '00100',
-    'cmpu': '00101', 'andu': '00110', 'oru': '00111', 'notu': '01000', 'movu': '01001',
-    'addh': '00000', 'subh': '00001', 'mulh': '00010', 'divh': '00011', 'modh': '00100',
-    'cmph': '00101', 'andh': '00110', 'orh': '00111', 'noth': '01000', 'movh': '01001',
-    'lsl': '01010', 'lsr': '01011', 'asr': '01100', 'nop': '01101', 'ld': '01110',
-    'st': '01111', 'beq': '10000', 'bgt': '10001', 'b': '10010', 'call': '10011',
-    'ret': '10100',
+# Opcodes (from SimpleRisc Table 3.10) - 5 bits, keyed by base mnemonic
+_BASE_OP = {
+    'add': 0b00000, 'sub': 0b00001, 'mul': 0b00010, 'div': 0b00011, 'mod': 0b00100,
+    'cmp': 0b00101, 'and': 0b00110, 'or': 0b00111, 'not': 0b01000, 'mov': 0b01001,
+    'lsl': 0b01010, 'lsr': 0b01011, 'asr': 0b01100, 'nop': 0b01101, 'ld': 0b01110,
+    'st': 0b01111, 'beq': 0b10000, 'bgt': 0b10001, 'b': 0b10010, 'call': 0b10011,
+    'ret': 0b10100,
 }
 
-MODIFIER_OPCODES = set ([
-    'addu', 'subu', 'mulu', 'divu', 'modu',
-    'cmpu', 'andu', 'oru', 'notu', 'movu',
-    'addh', 'subh', 'mulh', 'divh', 'modh',
-    'cmph', 'andh', 'orh', 'noth', 'movh',
-])
+# Modifier suffix -> 2 modifier bits of an immediate ('u' unsigned, 'h' high)
+_MOD_BITS = {'': 0b00, 'u': 0b01, 'h': 0b10}
+
+# Base mnemonics that accept a 'u'/'h' suffix (e.g. addu, movh)
+_MODIFIABLE = frozenset({'add', 'sub', 'mul', 'div', 'mod', 'cmp', 'and', 'or', 'not', 'mov'})
+
+def _suffixes(base):
+    """Modifier suffixes a base mnemonic may carry: '', 'u', 'h' or just ''."""
+    return tuple(_MOD_BITS) if base in _MODIFIABLE else ('',)
+
+# Every valid mnemonic spelling, e.g. 'add', 'addu', 'addh', 'lsl'
+_ALL_MNEMONICS = frozenset(base + suffix for base in _BASE_OP for suffix in _suffixes(base))
 
 # Register mapping (4 bits)
 REGISTERS = {
-    'r0': '0000', 'r1': '0001', 'r2': '0010', 'r3': '0011',
-    'r4': '0100', 'r5': '0101', 'r6': '0110', 'r7': '0111',
-    'r8': '1000', 'r9': '1001', 'r10': '1010', 'r11': '1011',
-    'r12': '1100', 'r13': '1101', 'r14': '1110', 'sp': '1110', # r14 is sp
-    'r15': '1111', 'ra': '1111', # r15 is ra
+    'r0': 0b0000, 'r1': 0b0001, 'r2': 0b0010, 'r3': 0b0011,
+    'r4': 0b0100, 'r5': 0b0101, 'r6': 0b0110, 'r7': 0b0111,
+    'r8': 0b1000, 'r9': 0b1001, 'r10': 0b1010, 'r11': 0b1011,
+    'r12': 0b1100, 'r13': 0b1101, 'r14': 0b1110, 'sp': 0b1110, # r14 is sp
+    'r15': 0b1111, 'ra': 0b1111, # r15 is ra
 }
 
+# Precompiled pattern used while parsing (compiled once, not per line)
+_MNEMONIC_RE = re.compile(r'([a-z]+)\s*(.*)')   # mnemonic followed by operands
+
 # Instruction Formats (simplified representation for this assembler)
 # 'branch': op | offset (27)
 # 'immediate': op | I=1 | rd (4) | rs1 (4) | imm (18)
@@ -43,15 +50,17 @@ REGISTERS = {
 
 # --- Helper Functions ---
 
-def to_binary(value, bits, signed=False):
-    """Converts an integer to a binary string of specified bit length."""
-    if signed:
-        # Handle two's complement for negative numbers
-        if value < 0:
-            value = (1 << bits) + value
-        return bin(value)[2:].zfill(bits)
-    else:
-        return bin(value)[2:].zfill(bits)
+def _enc_reg(op, I, rd, rs1, rs2):
+    """Packs a register format instruction into a 32-bit int."""
+    return (op << 27) | (I << 26) | (rd << 22) | (rs1 << 18) | (rs2 << 14)
+
+def _enc_imm(op, rd, rs1, mod, imm16):
+    """Packs an immediate format instruction (2 modifier bits + 16-bit constant) into a 32-bit int."""
+    return (op << 27) | (1 << 26) | (rd << 22) | (rs1 << 18) | (mod << 16) | (imm16 & 0xFFFF)
+
+def _enc_branch(op, off27):
+    """Packs a branch format instruction (27-bit signed offset) into a 32-bit int."""
+    return (op << 27) | (off27 & 0x7FFFFFF)
 
 def parse_line(line):
     """Parses a single line of assembly code."""
@@ -72,173 +81,222 @@ def parse_line(line):
         return label, None, None
 
     # Split instruction mnemonic and operands
-    match = re.match(r'([a-z]+)\s*(.*)', instruction_part)
+    match = _MNEMONIC_RE.match(instruction_part)
     if match:
         mnemonic = match.group(1)
-        operands_str = match.group(2).strip()
-        operands = [op.strip() for op in operands_str.split(',') if op.strip()]
+        operands = tuple(filter(None, map(str.strip, match.group(2).split(','))))
         return label, mnemonic, operands
     return label, None, None # Should not happen for valid lines
 
+# --- Instruction Handlers ---
+# Handlers are generated once at import time, one per (mnemonic, operand signature) the ISA
+# accepts, with the opcode and modifier bits already folded in. Each takes
+# (operands, label_map, current_address) and returns the encoded int.
+# Operand signatures use one letter per operand: R register, I immediate, M memory (imm[reg]), L label.
+
+class _AsmError(Exception):
+    """Raised when a line cannot be encoded; assemble() reports it and moves on."""
+
+def _imm16(value):
+    """Returns the 16-bit immediate field for value, rejecting values that do not fit."""
+    if not -0x8000 <= value <= 0xFFFF: # signed, or unsigned for the u/h modifiers
+        raise _AsmError(f"Error: Immediate {value} does not fit in 16 bits")
+    return value & 0xFFFF
+
+def _off27(offset):
+    """Returns the 27-bit branch offset field, rejecting offsets that do not fit."""
+    if not -(1 << 26) <= offset < (1 << 26):
+        raise _AsmError(f"Error: Branch offset {offset} does not fit in 27 bits")
+    return offset & 0x7FFFFFF
+
+def _operand_kind(operand):
+    """Classifies an operand as 'R', 'I', 'M' or 'L'."""
+    if operand in REGISTERS:
+        return 'R'
+    # Decimal immediate such as 10 or -3; str.isdecimal is cheaper than a regex fullmatch
+    if (operand[1:] if operand[:1] == '-' else operand).isdecimal():
+        return 'I'
+    if '[' in operand:
+        return 'M'
+    return 'L'
+
+def _make_const(word):
+    """Instructions without operands (nop, ret)."""
+    return lambda operands, label_map, current_address: word
+
+def _make_branch(op):
+    """beq/bgt/b/call label."""
+    head = _enc_branch(op, 0)
+    def handler(operands, label_map, current_address):
+        target_address = label_map.get(operands[0])
+        if target_address is None: # Forward reference, back-patched by assemble()
+            return head
+        # PC for offset calculation is (current instruction address + 1)
+        return head | _off27(target_address - (current_address + 1))
+    return handler
+
+def _make_reg(op, rd_pos, rs1_pos, rs2_pos):
+    """Register format; *_pos is the operand index of each field, or None to leave it 0."""
+    head = _enc_reg(op, 0, 0, 0, 0)
+    # Pick the field layout here so the returned handler is a single OR chain
+    if rd_pos is None: # cmp rs1, rs2
+        return lambda operands, label_map, current_address: (
+            head | (REGISTERS[operands[rs1_pos]] << 18) | (REGISTERS[operands[rs2_pos]] << 14))
+    if rs1_pos is None: # mov/not rd, rs2
+        return lambda operands, label_map, current_address: (
+            head | (REGISTERS[operands[rd_pos]] << 22) | (REGISTERS[operands[rs2_pos]] << 14))
+    return lambda operands, label_map, current_address: (
+        head | (REGISTERS[operands[rd_pos]] << 22) | (REGISTERS[operands[rs1_pos]] << 18)
+        | (REGISTERS[operands[rs2_pos]] << 14))
+
+def _make_imm(op, mod, rd_pos, rs1_pos, imm_pos):
+    """Immediate format; *_pos is the operand index of each field, or None to leave it 0."""
+    head = _enc_imm(op, 0, 0, mod, 0)
+    if rd_pos is None: # cmp rs1, imm
+        return lambda operands, label_map, current_address: (
+            head | (REGISTERS[operands[rs1_pos]] << 18) | _imm16(int(operands[imm_pos])))
+    if rs1_pos is None: # mov/not rd, imm
+        return lambda operands, label_map, current_address: (
+            head | (REGISTERS[operands[rd_pos]] << 22) | _imm16(int(operands[imm_pos])))
+    return lambda operands, label_map, current_address: (
+        head | (REGISTERS[operands[rd_pos]] << 22) | (REGISTERS[operands[rs1_pos]] << 18)
+        | _imm16(int(operands[imm_pos])))
+
+def _make_ldst(op):
+    """ld/st rd, imm[rs1] (always immediate format)."""
+    head = _enc_imm(op, 0, 0, 0b00, 0)
+    def handler(operands, label_map, current_address):
+        mem_operand = operands[1] # e.g., '4[sp]' or '[sp]'
+        lb = mem_operand.find('[')
+        rb = mem_operand.find(']', lb + 1)
+        # Exactly one bracket pair, closing at the end, with an optional immediate before it
+        if (lb < 0 or rb != len(mem_operand) - 1 or mem_operand.find('[', lb + 1, rb) >= 0
+                or (lb > 0 and _operand_kind(mem_operand[:lb]) != 'I')):
+            raise _AsmError(f"Error: Invalid memory operand '{mem_operand}'")
+        immediate_val = int(mem_operand[:lb]) if lb > 0 else 0 # e.g., '[sp]' means offset 0
+        base_reg = mem_operand[lb + 1:rb].strip() # allow '4[ sp ]'
+        if _operand_kind(base_reg) != 'R':
+            raise _AsmError(f"Error: Unknown register '{base_reg}'")
+        return head | (REGISTERS[operands[0]] << 22) | (REGISTERS[base_reg] << 18) | _imm16(immediate_val)
+    return handler
+
+# Mnemonic families (base mnemonics)
+_BRANCH = frozenset({'beq', 'bgt', 'b', 'call'})
+_CMP = frozenset({'cmp'})
+_RRR = frozenset({'add', 'sub', 'mul', 'div', 'mod', 'and', 'or'})
+_MOV_NOT = frozenset({'mov', 'not'})
+_LDST = frozenset({'ld', 'st'})
+
+def _build_dispatch():
+    """Enumerates every (mnemonic, operand signature) the assembler accepts."""
+    table = {}
+    for base, op in _BASE_OP.items():
+        for suffix in _suffixes(base):
+            mnemonic, mod = base + suffix, _MOD_BITS[suffix]
+            if base in _CMP: # cmp rs1, (reg/imm). rd is ignored.
+                table[(mnemonic, ('R', 'R'))] = _make_reg(op, None, 0, 1)
+                table[(mnemonic, ('R', 'I'))] = _make_imm(op, mod, None, 0, 1)
+            elif base in _RRR: # op rd, rs1, (reg/imm)
+                table[(mnemonic, ('R', 'R', 'R'))] = _make_reg(op, 0, 1, 2)
+                table[(mnemonic, ('R', 'R', 'I'))] = _make_imm(op, mod, 0, 1, 2)
+            elif base in _MOV_NOT: # mov/not rd, (reg/imm). rs1 is ignored.
+                table[(mnemonic, ('R', 'R'))] = _make_reg(op, 0, None, 1)
+                table[(mnemonic, ('R', 'I'))] = _make_imm(op, mod, 0, None, 1)
+            elif base in _LDST:
+                table[(mnemonic, ('R', 'M'))] = _make_ldst(op)
+            elif base in _BRANCH:
+                table[(mnemonic, ('L',))] = _make_branch(op)
+            elif base in ('nop', 'ret'): # branch format with 0 offset
+                table[(mnemonic, ())] = _make_const(_enc_branch(op, 0))
+    return table
+
+# (mnemonic, operand signature) -> handler; one dict lookup per instruction
+_DISPATCH = _build_dispatch()
+_DISPATCH_MNEMONICS = frozenset(mnemonic for mnemonic, _ in _DISPATCH)
+
 def assemble(assembly_code):
     """
-    Performs a two-pass assembly process.
+    Performs a single-pass assembly process, back-patching forward branch targets.
+    Returns (words, machine_code): words is an array('I') of the encoded instructions, and
+    machine_code lists (line_num, raw_line, index into words or None for label-only lines).
     """
     lines = assembly_code.strip().split('\n')
-    processed_lines = []
+    # Parsed lines kept as parallel lists; raw lines are only read for output and error messages
+    line_nums, labels, mnemonics, operand_lists, raw_lines = [], [], [], [], []
     for line_num, line in enumerate(lines):
         label, mnemonic, operands = parse_line(line)
         if mnemonic is not None or label is not None:
-            processed_lines.append({'line_num': line_num, 'label': label, 'mnemonic': mnemonic, 'operands': operands, 'raw_line': line})
+            line_nums.append(line_num)
+            labels.append(label)
+            mnemonics.append(mnemonic)
+            operand_lists.append(operands)
+            raw_lines.append(line)
 
-    # --- Pass 1: Build Label Map ---
+    # --- Encode Instructions ---
     label_map = {}
+    patches = [] # (index into words, target label, pc_next, line index) for forward branches
+    diagnostics = [] # (line_num, message), printed in source order after the label map
+    words = array('I') # Encoded instructions, one unboxed 32-bit word each
+    machine_code = []
     current_address = 0
-    for entry in processed_lines:
-        if entry['label']:
-            label_map[entry['label']] = current_address
-        if entry['mnemonic']: # Only increment address if it's an instruction
-            current_address += 1
+    for i, mnemonic in enumerate(mnemonics):
+        label = labels[i]
+        if label: # A label names the address of the next instruction
+            if label in label_map: # Keep the first definition so targets don't depend on position
+                diagnostics.append((line_nums[i], f"Error: Duplicate label '{label}' on line: {raw_lines[i]}"))
+            else:
+                label_map[label] = current_address
+
+        if not mnemonic: # It was just a label or empty line, no instruction to assemble
+            machine_code.append((line_nums[i], raw_lines[i], None))
+            continue
+
+        operands = operand_lists[i]
+        try:
+            if mnemonic not in _DISPATCH_MNEMONICS: # Reject before classifying any operand
+                if mnemonic not in _ALL_MNEMONICS:
+                    raise _AsmError(f"Error: Unknown mnemonic '{mnemonic}'")
+                raise _AsmError(f"Warning: Instruction '{mnemonic}' not fully implemented in tiny assembler. Skipping")
+            sig = tuple(map(_operand_kind, operands))
+            handler = _DISPATCH.get((mnemonic, sig))
+            if handler is None:
+                raise _AsmError(f"Error: Invalid operands '{', '.join(operands)}' for '{mnemonic}'")
+            assembled_instruction = handler(operands, label_map, current_address)
+        except _AsmError as e:
+            diagnostics.append((line_nums[i], f"{e} on line: {raw_lines[i]}"))
+        else:
+            if sig == ('L',) and operands[0] not in label_map:
+                # Forward reference: emitted with a zero offset, filled in once all labels are known
+                patches.append((len(words), operands[0], current_address + 1, i))
+            machine_code.append((line_nums[i], raw_lines[i], len(words)))
+            words.append(assembled_instruction)
+        current_address += 1 # Failed lines still take an address to keep the rest consistent
 
-    print("--- First Pass: Label Map ---")
+    # --- Back-patch forward branches ---
+    unresolved = set()
+    for idx, target_label, pc_next, i in patches:
+        try:
+            if target_label not in label_map:
+                raise _AsmError(f"Error: Undefined label '{target_label}'")
+            words[idx] |= _off27(label_map[target_label] - pc_next)
+        except _AsmError as e:
+            diagnostics.append((line_nums[i], f"{e} on line: {raw_lines[i]}"))
+            unresolved.add(idx)
+    if unresolved: # Drop the failed branches and renumber the remaining words
+        kept = [idx for idx in range(len(words)) if idx not in unresolved]
+        new_index = {old: new for new, old in enumerate(kept)}
+        words = array('I', (words[idx] for idx in kept))
+        machine_code = [(line_num, raw_line, None if idx is None else new_index[idx])
+                        for line_num, raw_line, idx in machine_code if idx not in unresolved]
+
+    print("--- Label Map ---")
     for label, addr in label_map.items():
         print(f"Label: {label}, Address: {addr}")
     print("-" * 30)
+    for _, message in sorted(diagnostics, key=lambda d: d[0]):
+        print(message)
 
-    # --- Pass 2: Encode Instructions ---
-    machine_code = []
-    current_address = 0
-    for entry in processed_lines:
-        mnemonic = entry['mnemonic']
-        operands = entry['operands']
-        raw_line = entry['raw_line']
-        assembled_instruction = None
-
-        if mnemonic:
-            opcode = OPCODES.get(mnemonic)
-            if not opcode:
-                print(f"Error: Unknown mnemonic '{mnemonic}' on line: {raw_line}")
-                current_address += 1 # Still increment to keep addresses consistent
-                continue
-
-            # Handle Branch/Call/Return (Branch Format)
-            if mnemonic in ['beq', 'bgt', 'b', 'call', 'ret']:
-                if mnemonic == 'ret': # ret is 0-address, offset field is 27 zeros
-                    offset_bin = to_binary(0, 27)
-                else: # Branch or Call, needs label resolution
-                    target_label = operands[0]
-                    if target_label not in label_map:
-                        print(f"Error: Undefined label '{target_label}' on line: {raw_line}")
-                        current_address += 1
-                        continue
-                    
-                    target_address = label_map[target_label]
-                    # PC for offset calculation is (current instruction address + 1)
-                    pc_next = current_address + 1
-                    offset = target_address - pc_next
-                    offset_bin = to_binary(offset, 27, signed=True)
-                assembled_instruction = opcode + offset_bin
-
-            # Handle Immediate/Register Format instructions (simplified)
-            elif mnemonic in ['cmp', 'sub', 'add', 'mul', 'mov', 'ld', 'st', 'and', 'or', 'not'] or mnemonic in MODIFIER_OPCODES:
-                I_bit = '1' # Assume immediate for simplicity if 3rd operand is numeric or for ld/st offset
-                rd_bin = '0000' # Default
-                rs1_bin = '0000' # Default
-                immediate_val = 0
-                
-                if mnemonic in ['cmp', 'cmpu', 'cmph']: # cmp rd, (reg/imm) -> cmp rs1, rs2/imm. rd is ignored.
-                    rs1_bin = REGISTERS.get(operands[0], '0000') # First operand is rs1
-                    if len(operands) > 1:
-                        if operands[1].isdigit() or (operands[1].startswith('-') and operands[1][1:].isdigit()):
-                            I_bit = '1'
-                            immediate_val = int(operands[1])
-                        else:
-                            I_bit = '0' # Register operand
-                            rs2_bin = REGISTERS.get(operands[1], '0000')
-                            # For register format, the 14 bits after rs2 are unused.
-                            assembled_instruction = opcode + I_bit + rd_bin + rs1_bin + rs2_bin + '0' * 14
-                            immediate_val = None # Not an immediate instruction
-                
-                elif mnemonic in ['sub', 'add', 'mul', 'and', 'or', 'subu', 'addu', 'mulu', 'andu', 'oru', 'subh', 'addh', 'mulh', 'andh', 'orh']: # reg, reg, (reg/imm)
-                    rd_bin = REGISTERS.get(operands[0], '0000')
-                    rs1_bin = REGISTERS.get(operands[1], '0000')
-                    if len(operands) > 2:
-                        if operands[2].isdigit() or (operands[2].startswith('-') and operands[2][1:].isdigit()):
-                            I_bit = '1'
-                            immediate_val = int(operands[2])
-                        else: # Register as second source operand
-                            I_bit = '0'
-                            rs2_bin = REGISTERS.get(operands[2], '0000')
-                            assembled_instruction = opcode + I_bit + rd_bin + rs1_bin + rs2_bin + '0' * 14
-                            immediate_val = None
-                
-                elif mnemonic in ['mov', 'movu','movh', 'not', 'notu', 'noth']: # mov reg, (reg/imm)
-                    rd_bin = REGISTERS.get(operands[0], '0000')
-                    if len(operands) > 1:
-                        if operands[1].isdigit() or (operands[1].startswith('-') and operands[1][1:].isdigit()):
-                            I_bit = '1'
-                            immediate_val = int(operands[1])
-                        else: # Register operand
-                            I_bit = '0'
-                            rs2_bin = REGISTERS.get(operands[1], '0000')
-                            assembled_instruction = opcode + I_bit + rd_bin + '0000' + rs2_bin + '0' * 14 # rs1 is 0000 for mov reg, reg
-                            immediate_val = None
-
-                elif mnemonic in ['ld', 'st']: # ld reg, imm[reg] or st reg, imm[reg]
-                    rd_bin = REGISTERS.get(operands[0], '0000') # Destination/Source register for load/store
-                    mem_operand = operands[1] # e.g., '4[sp]' or '[sp]'
-                    
-                    offset_match = re.match(r'(-?\d*)\[(.*?)\]', mem_operand)
-                    if offset_match:
-                        offset_str = offset_match.group(1)
-                        if offset_str:
-                            immediate_val = int(offset_str)
-                        else:
-                            immediate_val = 0 # e.g., '[sp]' means offset 0
-                        rs1_name = offset_match.group(2)
-                        rs1_bin = REGISTERS.get(rs1_name, '0000')
-                        I_bit = '1' # Always immediate format for ld/st offset
-                    else:
-                        print(f"Error: Invalid memory operand '{mem_operand}' on line: {raw_line}")
-                        current_address += 1
-                        continue
-
-                # If an immediate value was determined (I_bit='1') and not already assembled (like register format)
-                if I_bit == '1' and immediate_val is not None and assembled_instruction is None:
-                    imm_bin = to_binary(immediate_val, 16, signed=True) # 16 bits
-                    if mnemonic in MODIFIER_OPCODES:
-                        if mnemonic[-1] == 'u':
-                            imm_field = '01' + imm_bin
-                        else:
-                            imm_field = '10' + imm_bin                
-                    else:
-                        imm_field = '00' + imm_bin # 2 modifier bits + 16-bit constant
-                        
-                    assembled_instruction = opcode + I_bit + rd_bin + rs1_bin + imm_field
-
-            else:
-                # Fallback for other instructions if not specifically handled (e.g., nop)
-                if mnemonic == 'nop':
-                    assembled_instruction = OPCODES['nop'] + '0' * 27 # nop is a branch format with 0 offset
-                elif mnemonic == 'ret': # ret handled in branch logic
-                    assembled_instruction = OPCODES['ret'] + '0' * 27
-                else:
-                    print(f"Warning: Instruction '{mnemonic}' not fully implemented in tiny assembler. Skipping: {raw_line}")
-                    current_address += 1
-                    continue
-
-            if assembled_instruction:
-                # Ensure the instruction is exactly 32 bits.
-                if len(assembled_instruction) != 32:
-                     print(f"Error: Generated instruction length is {len(assembled_instruction)} not 32 for line: {raw_line}")
-                     assembled_instruction = '0' * 32 # Placeholder
-                machine_code.append((entry['line_num'], raw_line, assembled_instruction))
-            current_address += 1
-        else: # It was just a label or empty line, no instruction to assemble
-            machine_code.append((entry['line_num'], raw_line, None))
-
-
-    return machine_code
+    return words, machine_code
 
 # --- Your SimpleRisc Factorial Assembly Code ---
 factorial_assembly = """
@@ -264,21 +322,22 @@ call .factorial
 """
 
 # --- Assemble and Print ---
-assembled_program = assemble(factorial_assembly)
-
-print("\n--- Second Pass: Assembled Machine Code (Binary) ---")
-for line_num, original_line, binary_code in assembled_program:
-    if binary_code:
-        # Format into hex for easier reading
-        hex_code = f"0x{int(binary_code, 2):08X}"
-        print(f"[{line_num:02d}] {original_line.strip():<30} -> {binary_code} ({hex_code})")
-    else:
-        print(f"[{line_num:02d}] {original_line.strip():<30} -> (No instruction)")
-
-print('binary codes:')
-for _1, _2, binary_code in assembled_program: print(binary_code)
-
-print('hex codes:')
-for _1, _2, binary_code in assembled_program: 
-    hex_code = f"{int(binary_code, 2):08X}"
-    print(hex_code)
+if __name__ == '__main__':
+    words, assembled_program = assemble(factorial_assembly)
+
+    # Build all three listings in one pass and write them out at once
+    listing, binary_codes, hex_codes = [], [], []
+    for line_num, original_line, idx in assembled_program:
+        if idx is not None:
+            word = words[idx]
+            listing.append(f"[{line_num:02d}] {original_line.strip():<30} -> {word:032b} (0x{word:08X})")
+            binary_codes.append(f"{word:032b}")
+            hex_codes.append(f"{word:08X}")
+        else:
+            listing.append(f"[{line_num:02d}] {original_line.strip():<30} -> (No instruction)")
+
+    sys.stdout.write('\n'.join([
+        "\n--- Assembled Machine Code (Binary) ---", *listing,
+        'binary codes:', *binary_codes,
+        'hex codes:', *hex_codes,
+    ]) + '\n')